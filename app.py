@@ -1,12 +1,120 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 import fastf1
 from pathlib import Path
 from data_processor import F1DataProcessor
-from visualizations import F1Visualizations
+from visualizations import F1Visualizations, speed_delta
 from datetime import datetime
-import plotly.graph_objects as go
 import base64
+from typing import NamedTuple, Optional
+
+# Channels each section needs before it renders (based on test file structure)
+_TIMING_REQ = frozenset({
+    'Time', 'Driver', 'LapTime', 'LapNumber', 'Stint',
+    'Sector1Time', 'Sector2Time', 'Sector3Time', 'Compound'
+})
+_POSITION_REQ = frozenset({'Driver', 'Position'})
+_WEATHER_REQ = frozenset({
+    'Time', 'AirTemp', 'Humidity', 'Pressure',
+    'Rainfall', 'TrackTemp', 'WindDirection', 'WindSpeed'
+})
+_TELEMETRY_REQ = frozenset({'Speed', 'RPM', 'nGear', 'DRS', 'Distance', 'Time'})
+
+# Render telemetry-length, weather and tyre strategy traces with WebGL instead of SVG
+_USE_WEBGL = True
+
+@st.cache_resource(show_spinner=False)
+def _get_processor() -> F1DataProcessor:
+    """Shared data processor (and FastF1 cache handle) for the server process."""
+    return F1DataProcessor(cache_dir='./f1_cache')
+
+@st.cache_resource(show_spinner=False)
+def _get_visualizer() -> F1Visualizations:
+    """Shared, stateless chart builder for the server process."""
+    return F1Visualizations()
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def _get_schedule(year: int) -> pd.DataFrame:
+    """Event schedule for a season, memoized across reruns."""
+    return fastf1.get_event_schedule(year)
+
+@st.cache_data(ttl=None, max_entries=8, show_spinner=False)
+def _load_session(year: int, gp: str, session_type: str):
+    """Load and process a session once per (year, gp, session_type)."""
+    return _get_processor().load_session_data(
+        year=year,
+        gp=gp,
+        session_type=session_type
+    )
+
+@st.cache_resource(show_spinner=False)
+def _encoded_image(path: str) -> str:
+    """Base64-encode an image once per process; the string is shared, not copied."""
+    with open(path, "rb") as image_file:
+        return base64.b64encode(image_file.read()).decode()
+
+@st.cache_resource(show_spinner=False, max_entries=64)
+def _cached_figure(session_key: tuple, chart_key: str, _build):
+    """Build a chart once per (session, chart) and reuse it across reruns.
+
+    st.plotly_chart only serializes figures, so the cached object is shared
+    as-is rather than pickled per hit. `_build` is excluded from hashing.
+    """
+    return _build()
+
+class DriverPlotFlags(NamedTuple):
+    """Which comparison plots a driver's telemetry can feed."""
+    nonempty: bool
+    has_speed: bool  # Speed and Distance channels present
+    has_gear: bool   # nGear and Distance channels present
+
+def _plot_flags(telemetry: pd.DataFrame) -> DriverPlotFlags:
+    """Check a telemetry frame's channels once for all comparison tabs."""
+    columns = telemetry.columns
+    nonempty = not telemetry.empty
+    has_distance = nonempty and 'Distance' in columns
+    return DriverPlotFlags(
+        nonempty=nonempty,
+        has_speed=has_distance and 'Speed' in columns,
+        has_gear=has_distance and 'nGear' in columns
+    )
+
+class TimingSummary(NamedTuple):
+    """Session figures shown next to the timing charts; None when a channel is missing."""
+    fastest_lap: Optional[pd.Series]        # Driver and LapTime of the fastest lap
+    total_laps: Optional[float]
+    final_positions: Optional[pd.DataFrame]  # Driver indexed by 'P<n>'
+
+@st.cache_resource(show_spinner=False, max_entries=8)
+def _timing_summary(session_key: tuple, _timing: pd.DataFrame) -> TimingSummary:
+    """Derive the lap and position summaries once per session instead of on every rerun."""
+    columns = _timing.columns
+
+    fastest_lap = None
+    if 'LapTime' in columns and _timing['LapTime'].notna().any():
+        fastest_lap = _timing.loc[_timing['LapTime'].idxmin(), ['Driver', 'LapTime']]
+
+    total_laps = None
+    if 'LapNumber' in columns:
+        total_laps = np.nanmax(_timing['LapNumber'].to_numpy())
+
+    final_positions = None
+    if _POSITION_REQ.issubset(columns):
+        # Laps are in lap order per driver, so last() is the final position
+        positions = (
+            _timing.groupby('Driver', sort=False, observed=True)['Position']
+            .last()
+            .dropna()
+            .astype(int)
+            .sort_values()
+        )
+        final_positions = pd.DataFrame(
+            {'Driver': positions.index},
+            index='P' + positions.astype(str)
+        )
+
+    return TimingSummary(fastest_lap, total_laps, final_positions)
 
 class F1DashboardApp:
     def __init__(self):
@@ -28,6 +136,12 @@ class F1DashboardApp:
             st.session_state.selected_driver1 = None
         if 'selected_driver2' not in st.session_state:
             st.session_state.selected_driver2 = None
+        if 'session_key' not in st.session_state:
+            st.session_state.session_key = None
+        if 'driver_index' not in st.session_state:
+            st.session_state.driver_index = {}
+        if 'driver_options' not in st.session_state:
+            st.session_state.driver_options = []
 
     def setup_page_config(self):
         """Configure Streamlit page settings."""
@@ -37,48 +151,32 @@ class F1DashboardApp:
             layout="wide",
             initial_sidebar_state="expanded"
         )
-        
-    def get_unique_key(self, base: str, *args) -> str:
-        """Generate a unique key for Streamlit elements.
-        
-        Args:
-            base (str): Base name for the key
-            *args: Additional arguments to make the key unique
-            
-        Returns:
-            str: Unique key string
-        """
-        key_parts = [base] + [str(arg) for arg in args if arg is not None]
-        return "_".join(key_parts)    
 
     def initialize_components(self):
         """Initialize data processor and visualization components."""
         try:
-            self.data_processor = F1DataProcessor(cache_dir='./f1_cache')
-            self.visualizer = F1Visualizations()
+            self.data_processor = _get_processor()
+            self.visualizer = _get_visualizer()
         except Exception as e:
             st.error(f"Failed to initialize components: {str(e)}")
             st.stop()
 
     def get_base64_encoded_image(self, image_path):
         """Convert image to base64 string."""
-        with open(image_path, "rb") as image_file:
-            return base64.b64encode(image_file.read()).decode()
+        return _encoded_image(image_path)
 
     def apply_custom_css(self):
-        """Apply custom CSS styling."""
+        """Apply custom CSS styling on top of the theme in .streamlit/config.toml.
+
+        Streamlit drops elements that are not re-emitted on a rerun, so the
+        style tag has to be written on every run rather than once per session.
+        """
         st.markdown("""
             <style>
             @import url('https://fonts.googleapis.com/css2?family=Titillium+Web:wght@400;600;700&display=swap');
             
             .stApp {
                 font-family: 'Titillium Web', sans-serif !important;
-                background-color: #15151e !important;
-                color: white;
-            }
-            
-            .sidebar .sidebar-content {
-                background-color: #15151e;
             }
             
             .stButton > button {
@@ -123,7 +221,6 @@ class F1DashboardApp:
             }
             
             .stSelectbox > div {
-                background-color: #1F1F1F;
                 border-radius: 8px;
             }
             
@@ -141,11 +238,7 @@ class F1DashboardApp:
         """Load F1 session data with error handling."""
         try:
             with st.spinner("Loading session data..."):
-                session_data = self.data_processor.load_session_data(
-                    year=year,
-                    gp=gp,
-                    session_type=session_type
-                )
+                session_data = _load_session(year, gp, session_type)
                 
                 if session_data:
                     # Verify data based on test file structure
@@ -156,8 +249,20 @@ class F1DashboardApp:
                         hasattr(session_data, 'driver_info') and
                         hasattr(session_data, 'event_info')):
                         
+                        # Column sets used by the renderers' channel checks
+                        session_data.timing_cols = frozenset(session_data.timing.columns)
+                        session_data.weather_cols = frozenset(session_data.weather.columns)
+
                         st.session_state.session_data = session_data
+                        st.session_state.session_key = (year, gp, session_type)
                         st.session_state.data_loaded = True
+
+                        # Driver lookups shared by the telemetry and comparison renderers
+                        st.session_state.driver_index = {
+                            d['abbreviation']: (str(d['number']), d['team'])
+                            for d in session_data.driver_info
+                        }
+                        st.session_state.driver_options = list(st.session_state.driver_index)
                         st.success("Data loaded successfully!")
                         return True
                     
@@ -200,7 +305,7 @@ class F1DashboardApp:
             )
             
             try:
-                schedule = fastf1.get_event_schedule(year)
+                schedule = _get_schedule(year)
                 gp_names = schedule['EventName'].tolist()
                 
                 gp = st.selectbox(
@@ -257,16 +362,15 @@ class F1DashboardApp:
         
         # Verify timing data structure based on test file
         if not data.timing.empty:
-            required_channels = [
-                'Time', 'Driver', 'LapTime', 'LapNumber', 'Stint', 
-                'Sector1Time', 'Sector2Time', 'Sector3Time', 'Compound'
-            ]
-            
-            if all(channel in data.timing.columns for channel in required_channels):
+            if _TIMING_REQ.issubset(data.timing_cols):
                 st.header("📊 Lap Time Analysis")
                 
                 # Lap Time Evolution
-                lap_time_fig = self.visualizer.create_lap_time_chart(data.timing)
+                lap_time_fig = _cached_figure(
+                    st.session_state.session_key,
+                    "lap_time",
+                    lambda: self.visualizer.create_lap_time_chart(data.timing)
+                )
                 st.plotly_chart(
                     lap_time_fig, 
                     use_container_width=True, 
@@ -274,24 +378,29 @@ class F1DashboardApp:
                 )
                 
                 # Get fastest lap info for display
-                fastest_lap = data.timing.sort_values('LapTime').iloc[0]
-                st.markdown(f"""
-                    <div style='background: #1F1F1F; padding: 1rem; border-radius: 8px; margin: 1rem 0;'>
-                        <h4>Fastest Lap: {fastest_lap['Driver']} - {fastest_lap['LapTime']}</h4>
-                    </div>
-                """, unsafe_allow_html=True)
+                fastest_lap = _timing_summary(st.session_state.session_key, data.timing).fastest_lap
+                if fastest_lap is not None:
+                    st.markdown(f"""
+                        <div style='background: #1F1F1F; padding: 1rem; border-radius: 8px; margin: 1rem 0;'>
+                            <h4>Fastest Lap: {fastest_lap['Driver']} - {fastest_lap['LapTime']}</h4>
+                        </div>
+                    """, unsafe_allow_html=True)
                 
                 # Tyre Strategy if compound data is available
-                if 'Compound' in data.timing.columns:
+                if 'Compound' in data.timing_cols:
                     st.header("🔄 Tyre Strategy")
-                    tyre_fig = self.visualizer.create_tyre_strategy(data.timing)
+                    tyre_fig = _cached_figure(
+                        st.session_state.session_key,
+                        "tyre_strategy",
+                        lambda: self.visualizer.create_tyre_strategy(data.timing, webgl=_USE_WEBGL)
+                    )
                     st.plotly_chart(
                         tyre_fig, 
                         use_container_width=True, 
                         key="tyre_strategy_chart"
                     )
             else:
-                missing = [ch for ch in required_channels if ch not in data.timing.columns]
+                missing = sorted(_TIMING_REQ - data.timing_cols)
                 st.warning(f"Missing required timing channels: {', '.join(missing)}")
         else:
             st.warning("No lap timing data available")
@@ -305,20 +414,25 @@ class F1DashboardApp:
         data = st.session_state.session_data
         
         # Verify timing data has required position info
-        if not data.timing.empty and 'Position' in data.timing.columns:
+        if not data.timing.empty and 'Position' in data.timing_cols:
             st.header("🏁 Position Changes")
             
+            summary = _timing_summary(st.session_state.session_key, data.timing)
+            
             # Add race progress info
-            if 'LapNumber' in data.timing.columns:
-                total_laps = data.timing['LapNumber'].max()
+            if summary.total_laps is not None:
                 st.markdown(f"""
                     <div style='background: #1F1F1F; padding: 1rem; border-radius: 8px; margin: 1rem 0;'>
-                        <h4>Total Laps: {total_laps}</h4>
+                        <h4>Total Laps: {summary.total_laps}</h4>
                     </div>
                 """, unsafe_allow_html=True)
             
             # Create position changes visualization
-            position_fig = self.visualizer.create_position_changes_chart(data.timing)
+            position_fig = _cached_figure(
+                st.session_state.session_key,
+                "position_changes",
+                lambda: self.visualizer.create_position_changes_chart(data.timing)
+            )
             st.plotly_chart(
                 position_fig, 
                 use_container_width=True, 
@@ -326,18 +440,10 @@ class F1DashboardApp:
             )
             
             # Add driver position summary if available
-            if all(col in data.timing.columns for col in ['Driver', 'Position']):
-                final_positions = data.timing.groupby('Driver')['Position'].last().sort_values()
-                
-                st.markdown("""
-                    <div style='background: #1F1F1F; padding: 1rem; border-radius: 8px; margin: 1rem 0;'>
-                        <h4>Final Positions:</h4>
-                """, unsafe_allow_html=True)
-                
-                for driver, position in final_positions.items():
-                    st.markdown(f"P{int(position)}: {driver}")
-                
-                st.markdown("</div>", unsafe_allow_html=True)
+            if summary.final_positions is not None:
+                # One table element instead of a markdown element per driver
+                st.markdown("### Final Positions")
+                st.table(summary.final_positions)
         else:
             st.warning("Position data not available")
 
@@ -351,12 +457,7 @@ class F1DashboardApp:
         
         # Verify weather data based on test file structure
         if not data.weather.empty:
-            required_channels = [
-                'Time', 'AirTemp', 'Humidity', 'Pressure',
-                'Rainfall', 'TrackTemp', 'WindDirection', 'WindSpeed'
-            ]
-            
-            if all(channel in data.weather.columns for channel in required_channels):
+            if _WEATHER_REQ.issubset(data.weather_cols):
                 st.header("🌡️ Weather Conditions")
                 
                 # Display current conditions
@@ -373,7 +474,11 @@ class F1DashboardApp:
                     st.metric("Wind Speed", f"{latest_weather['WindSpeed']:.1f} km/h")
                 
                 # Weather trends visualization
-                weather_fig = self.visualizer.create_weather_chart(data.weather)
+                weather_fig = _cached_figure(
+                    st.session_state.session_key,
+                    "weather",
+                    lambda: self.visualizer.create_weather_chart(data.weather, webgl=_USE_WEBGL)
+                )
                 st.plotly_chart(
                     weather_fig, 
                     use_container_width=True, 
@@ -389,13 +494,14 @@ class F1DashboardApp:
                         </div>
                     """, unsafe_allow_html=True)
             else:
-                missing = [ch for ch in required_channels if ch not in data.weather.columns]
+                missing = sorted(_WEATHER_REQ - data.weather_cols)
                 st.warning(f"Missing required weather channels: {', '.join(missing)}")
         else:
             st.info("No weather data available for this session")        
 
+    @st.fragment
     def render_telemetry(self):
-        """Render telemetry analysis section using driver numbers."""
+        """Render telemetry analysis section; runs as a fragment so driver changes rerun only this section."""
         if not st.session_state.data_loaded:
             st.warning("Please load session data first")
             return
@@ -404,45 +510,46 @@ class F1DashboardApp:
         
         data = st.session_state.session_data
         
-        # Create mapping between driver abbreviations and numbers
-        driver_mapping = {
-            
-            d['abbreviation']: d['number'] for d in st.session_state.session_data.driver_info
-        }
-        
+        driver_index = st.session_state.driver_index
         
         # Driver selection using abbreviations for display
-        driver_options = [d['abbreviation'] for d in st.session_state.session_data.driver_info]
         selected_driver_abbrev = st.selectbox(
             "Select Driver",
-            driver_options,
-            key=self.get_unique_key("telemetry_driver_select", "main")
+            st.session_state.driver_options,
+            key="telemetry_driver_select_main"
         )
         
-        # Get driver number for telemetry lookup
-        selected_driver_number = str(driver_mapping.get(selected_driver_abbrev))
+        # Get driver number for telemetry lookup and team for display
+        selected_driver_number, team = driver_index.get(selected_driver_abbrev, (None, 'Unknown'))
         
         if selected_driver_number:
-            # Get team information using abbreviation
-            team = next((d['team'] for d in data.driver_info 
-                        if d['abbreviation'] == selected_driver_abbrev), 'Unknown')
-            
             # Get telemetry data using driver number
             telemetry = data.telemetry.get(selected_driver_number, pd.DataFrame())
             
             if not telemetry.empty:
                 # Verify required channels based on test file
-                required_channels = ['Speed', 'RPM', 'nGear', 'DRS', 'Distance', 'Time']
-                
-                if all(channel in telemetry.columns for channel in required_channels):
+                if _TELEMETRY_REQ.issubset(telemetry.columns):
+                    # Single pass over the channels for every summary statistic below
+                    stats = telemetry.agg({
+                        'Speed': ['max', 'mean', 'min'],
+                        'RPM': ['mean', 'max'],
+                        'Distance': ['max'],
+                        'DRS': ['sum']
+                    })
+
                     col1, col2 = st.columns(2)
                     
                     with col1:
                         st.subheader("Speed Trace")
-                        speed_fig = self.visualizer.create_speed_trace(
-                            telemetry,
-                            selected_driver_abbrev,  # Using abbreviation for display
-                            team
+                        speed_fig = _cached_figure(
+                            st.session_state.session_key,
+                            f"speed_trace_{selected_driver_number}",
+                            lambda: self.visualizer.create_speed_trace(
+                                telemetry,
+                                selected_driver_abbrev,  # Using abbreviation for display
+                                team,
+                                webgl=_USE_WEBGL
+                            )
                         )
                         st.plotly_chart(speed_fig, use_container_width=True, 
                                     key=f"speed_trace_{selected_driver_number}")
@@ -451,33 +558,35 @@ class F1DashboardApp:
                         speed_stats = pd.DataFrame({
                             'Metric': ['Maximum Speed', 'Average Speed', 'Minimum Speed'],
                             'Value': [
-                                f"{telemetry['Speed'].max():.1f} km/h",
-                                f"{telemetry['Speed'].mean():.1f} km/h",
-                                f"{telemetry['Speed'].min():.1f} km/h"
+                                f"{stats.loc['max', 'Speed']:.1f} km/h",
+                                f"{stats.loc['mean', 'Speed']:.1f} km/h",
+                                f"{stats.loc['min', 'Speed']:.1f} km/h"
                             ]
                         })
                         st.dataframe(speed_stats, use_container_width=True)
                     
                     with col2:
                         st.subheader("Gear Shifts")
-                        gear_fig = self.visualizer.create_gear_shifts(
-                            telemetry,
-                            selected_driver_abbrev,  # Using abbreviation for display
-                            team
+                        gear_fig = _cached_figure(
+                            st.session_state.session_key,
+                            f"gear_shifts_{selected_driver_number}",
+                            lambda: self.visualizer.create_gear_shifts(
+                                telemetry,
+                                selected_driver_abbrev,  # Using abbreviation for display
+                                team,
+                                webgl=_USE_WEBGL
+                            )
                         )
                         st.plotly_chart(gear_fig, use_container_width=True, 
                                     key=f"gear_shifts_{selected_driver_number}")
                         
                         # Display gear usage statistics
-                        if 'nGear' in telemetry.columns:
-                            gear_stats = telemetry['nGear'].value_counts().sort_index()
-                            gear_pct = (gear_stats / len(telemetry) * 100).round(1)
-                            gear_stats_df = pd.DataFrame({
-                                'Count': gear_stats,
-                                'Percentage': gear_pct
-                            })
-                            st.markdown("### Gear Usage Analysis")
-                            st.dataframe(gear_stats_df, use_container_width=True)
+                        gear_stats = telemetry['nGear'].value_counts().sort_index()
+                        gear_stats_df = gear_stats.to_frame('Count').assign(
+                            Percentage=gear_stats.div(len(telemetry)).mul(100).round(1)
+                        )
+                        st.markdown("### Gear Usage Analysis")
+                        st.dataframe(gear_stats_df, use_container_width=True)
                     
                     # Additional telemetry insights
                     st.markdown("### Additional Insights")
@@ -485,41 +594,37 @@ class F1DashboardApp:
                     
                     with col1:
                         # DRS Usage
-                        if 'DRS' in telemetry.columns:
-                            drs_usage = (telemetry['DRS'].sum() / len(telemetry) * 100).round(1)
-                            st.metric("DRS Usage", f"{drs_usage}%")
+                        drs_usage = (stats.loc['sum', 'DRS'] / len(telemetry) * 100).round(1)
+                        st.metric("DRS Usage", f"{drs_usage}%")
                     
                     with col2:
                         # RPM Statistics
-                        if 'RPM' in telemetry.columns:
-                            avg_rpm = telemetry['RPM'].mean().round(0)
-                            max_rpm = telemetry['RPM'].max().round(0)
-                            st.metric("Average RPM", f"{avg_rpm:,.0f}",
-                                    delta=f"Max: {max_rpm:,.0f}")
+                        avg_rpm = stats.loc['mean', 'RPM'].round(0)
+                        max_rpm = stats.loc['max', 'RPM'].round(0)
+                        st.metric("Average RPM", f"{avg_rpm:,.0f}",
+                                delta=f"Max: {max_rpm:,.0f}")
                     
                     with col3:
                         # Distance Covered
-                        if 'Distance' in telemetry.columns:
-                            total_distance = telemetry['Distance'].max()
-                            st.metric("Distance Covered", f"{total_distance/1000:.2f} km")
+                        total_distance = stats.loc['max', 'Distance']
+                        st.metric("Distance Covered", f"{total_distance/1000:.2f} km")
                     
                     # Time Analysis
-                    if 'Time' in telemetry.columns:
-                        st.markdown("### Session Timeline")
-                        time_data = telemetry['Time'].dt.total_seconds()
-                        session_duration = time_data.max() - time_data.min()
-                        st.info(f"Session Duration: {session_duration/60:.1f} minutes")
+                    st.markdown("### Session Timeline")
+                    session_duration = (telemetry['Time'].max() - telemetry['Time'].min()).total_seconds()
+                    st.info(f"Session Duration: {session_duration/60:.1f} minutes")
                     
                 else:
-                    missing = [ch for ch in required_channels if ch not in telemetry.columns]
+                    missing = sorted(_TELEMETRY_REQ.difference(telemetry.columns))
                     st.warning(f"Missing required telemetry channels: {', '.join(missing)}")
             else:
                 st.warning(f"No telemetry data available for {selected_driver_abbrev}")
         else:
             st.error("Unable to retrieve driver information")
 
+    @st.fragment
     def render_driver_comparison(self):
-        """Render driver comparison section using driver numbers for telemetry data."""
+        """Render driver comparison section; runs as a fragment so driver changes rerun only this section."""
         if not st.session_state.data_loaded:
             st.warning("Please load session data first")
             return
@@ -528,17 +633,11 @@ class F1DashboardApp:
         
         data = st.session_state.session_data
         
-        # Create a mapping of abbreviations to driver numbers
-        driver_mapping = {
-            d['abbreviation']: d['number'] for d in data.driver_info
-        }
-        
-        # Create reverse mapping for display purposes
-        number_to_abbrev = {v: k for k, v in driver_mapping.items()}
+        driver_index = st.session_state.driver_index
         
         # Driver selection using abbreviations for display
         col1, col2 = st.columns(2)
-        driver_options = [d['abbreviation'] for d in data.driver_info]
+        driver_options = st.session_state.driver_options
         
         with col1:
             driver1_abbrev = st.selectbox(
@@ -546,29 +645,26 @@ class F1DashboardApp:
                 options=driver_options,
                 key="comparison_driver1"
             )
-            # Get driver number for telemetry lookup
-            driver1_number = driver_mapping.get(driver1_abbrev)
+            # Get driver number for telemetry lookup and team for display
+            driver1_number, team1 = driver_index.get(driver1_abbrev, (None, 'Unknown'))
             
         with col2:
-            driver2_options = [d for d in driver_options if d != driver1_abbrev]
+            i = driver_options.index(driver1_abbrev) if driver1_abbrev is not None else 0
+            driver2_options = driver_options[:i] + driver_options[i + 1:]
             driver2_abbrev = st.selectbox(
                 "Select Second Driver",
                 options=driver2_options,
                 key="comparison_driver2"
             )
-            # Get driver number for telemetry lookup
-            driver2_number = driver_mapping.get(driver2_abbrev)
+            # Get driver number for telemetry lookup and team for display
+            driver2_number, team2 = driver_index.get(driver2_abbrev, (None, 'Unknown'))
         
         if driver1_number and driver2_number:
-            # Get team information using abbreviations
-            team1 = next((d['team'] for d in data.driver_info 
-                        if d['abbreviation'] == driver1_abbrev), 'Unknown')
-            team2 = next((d['team'] for d in data.driver_info 
-                        if d['abbreviation'] == driver2_abbrev), 'Unknown')
-            
             # Get telemetry data using driver numbers
-            telemetry1 = data.telemetry.get(str(driver1_number), pd.DataFrame())
-            telemetry2 = data.telemetry.get(str(driver2_number), pd.DataFrame())
+            telemetry1 = data.telemetry.get(driver1_number, pd.DataFrame())
+            telemetry2 = data.telemetry.get(driver2_number, pd.DataFrame())
+            flags1 = _plot_flags(telemetry1)
+            flags2 = _plot_flags(telemetry2)
             
             # Create tabs for different comparisons
             comparison_tabs = st.tabs([
@@ -579,17 +675,19 @@ class F1DashboardApp:
             ])
             
             with comparison_tabs[0]:
-                if (not telemetry1.empty and not telemetry2.empty and
-                    'Speed' in telemetry1.columns and 'Speed' in telemetry2.columns and
-                    'Distance' in telemetry1.columns and 'Distance' in telemetry2.columns):
-                    
-                    comparison_fig = self.visualizer.create_driver_comparison(
-                        telemetry1,
-                        telemetry2,
-                        driver1_abbrev,
-                        driver2_abbrev,
-                        team1,
-                        team2
+                if flags1.has_speed and flags2.has_speed:
+                    comparison_fig = _cached_figure(
+                        st.session_state.session_key,
+                        f"comparison_{driver1_number}_{driver2_number}",
+                        lambda: self.visualizer.create_driver_comparison(
+                            telemetry1,
+                            telemetry2,
+                            driver1_abbrev,
+                            driver2_abbrev,
+                            team1,
+                            team2,
+                            webgl=_USE_WEBGL
+                        )
                     )
                     st.plotly_chart(comparison_fig, use_container_width=True, 
                                 key=f"speed_comparison_{driver1_number}_{driver2_number}")
@@ -599,63 +697,83 @@ class F1DashboardApp:
             with comparison_tabs[1]:
                 col1, col2 = st.columns(2)
                 with col1:
-                    if not telemetry1.empty and 'nGear' in telemetry1.columns and 'Distance' in telemetry1.columns:
-                        gear_fig1 = self.visualizer.create_gear_shifts(
-                            telemetry1,
-                            driver1_abbrev,
-                            team1
+                    if flags1.has_gear:
+                        gear_fig1 = _cached_figure(
+                            st.session_state.session_key,
+                            f"gear_shifts_{driver1_number}",
+                            lambda: self.visualizer.create_gear_shifts(
+                                telemetry1,
+                                driver1_abbrev,
+                                team1,
+                                webgl=_USE_WEBGL
+                            )
                         )
                         st.plotly_chart(gear_fig1, use_container_width=True,
-                                    key=f"gear_shifts_{driver1_number}")
+                                    key=f"comparison_gear_shifts_{driver1_number}")
                     else:
                         st.warning(f"Gear data not available for {driver1_abbrev}")
                         
                 with col2:
-                    if not telemetry2.empty and 'nGear' in telemetry2.columns and 'Distance' in telemetry2.columns:
-                        gear_fig2 = self.visualizer.create_gear_shifts(
-                            telemetry2,
-                            driver2_abbrev,
-                            team2
+                    if flags2.has_gear:
+                        gear_fig2 = _cached_figure(
+                            st.session_state.session_key,
+                            f"gear_shifts_{driver2_number}",
+                            lambda: self.visualizer.create_gear_shifts(
+                                telemetry2,
+                                driver2_abbrev,
+                                team2,
+                                webgl=_USE_WEBGL
+                            )
                         )
                         st.plotly_chart(gear_fig2, use_container_width=True,
-                                    key=f"gear_shifts_{driver2_number}")
+                                    key=f"comparison_gear_shifts_{driver2_number}")
                     else:
                         st.warning(f"Gear data not available for {driver2_abbrev}")
             
             with comparison_tabs[2]:
                 col1, col2 = st.columns(2)
                 with col1:
-                    if not telemetry1.empty and 'Speed' in telemetry1.columns and 'Distance' in telemetry1.columns:
-                        speed_fig1 = self.visualizer.create_speed_trace(
-                            telemetry1,
-                            driver1_abbrev,
-                            team1
+                    if flags1.has_speed:
+                        speed_fig1 = _cached_figure(
+                            st.session_state.session_key,
+                            f"speed_trace_{driver1_number}",
+                            lambda: self.visualizer.create_speed_trace(
+                                telemetry1,
+                                driver1_abbrev,
+                                team1,
+                                webgl=_USE_WEBGL
+                            )
                         )
                         st.plotly_chart(speed_fig1, use_container_width=True,
-                                    key=f"speed_trace_{driver1_number}")
+                                    key=f"comparison_speed_trace_{driver1_number}")
                     else:
                         st.warning(f"Speed trace data not available for {driver1_abbrev}")
                         
                 with col2:
-                    if not telemetry2.empty and 'Speed' in telemetry2.columns and 'Distance' in telemetry2.columns:
-                        speed_fig2 = self.visualizer.create_speed_trace(
-                            telemetry2,
-                            driver2_abbrev,
-                            team2
+                    if flags2.has_speed:
+                        speed_fig2 = _cached_figure(
+                            st.session_state.session_key,
+                            f"speed_trace_{driver2_number}",
+                            lambda: self.visualizer.create_speed_trace(
+                                telemetry2,
+                                driver2_abbrev,
+                                team2,
+                                webgl=_USE_WEBGL
+                            )
                         )
                         st.plotly_chart(speed_fig2, use_container_width=True,
-                                    key=f"speed_trace_{driver2_number}")
+                                    key=f"comparison_speed_trace_{driver2_number}")
                     else:
                         st.warning(f"Speed trace data not available for {driver2_abbrev}")
             
             with comparison_tabs[3]:
-                if not telemetry1.empty and not telemetry2.empty:
+                if flags1.nonempty and flags2.nonempty:
                     col1, col2 = st.columns(2)
                     
                     # Speed statistics
                     with col1:
                         st.markdown("### Speed Analysis")
-                        if 'Speed' in telemetry1.columns and 'Speed' in telemetry2.columns:
+                        if flags1.has_speed and flags2.has_speed:
                             stats_df = pd.DataFrame({
                                 driver1_abbrev: [
                                     f"{telemetry1['Speed'].max():.1f}",
@@ -674,48 +792,44 @@ class F1DashboardApp:
                     
                     # Gear usage statistics
                     with col2:
-                        if 'nGear' in telemetry1.columns and 'nGear' in telemetry2.columns:
+                        if flags1.has_gear and flags2.has_gear:
                             st.markdown("### Gear Usage")
-                            gear_stats = pd.DataFrame({
+                            gear_stats = pd.concat({
                                 driver1_abbrev: telemetry1['nGear'].value_counts(normalize=True),
                                 driver2_abbrev: telemetry2['nGear'].value_counts(normalize=True)
-                            }).fillna(0) * 100
-                            gear_stats = gear_stats.round(1)
+                            }, axis=1).sort_index().fillna(0).mul(100).round(1)
                             st.dataframe(gear_stats, use_container_width=True)
                         else:
                             st.warning("Gear usage data not available")
                     
                     # Speed differential
-                    if all(col in telemetry1.columns for col in ['Speed', 'Distance']) and \
-                    all(col in telemetry2.columns for col in ['Speed', 'Distance']):
+                    if flags1.has_speed and flags2.has_speed:
                         st.markdown("### Speed Differential Analysis")
                         
-                        # Prepare data for analysis
-                        data1 = telemetry1[['Distance', 'Speed']].sort_values('Distance')
-                        data2 = telemetry2[['Distance', 'Speed']].sort_values('Distance')
-                        
-                        merged_data = pd.merge_asof(
-                            data1, data2,
-                            on='Distance',
-                            suffixes=('_1', '_2')
-                        )
-                        
-                        speed_delta = merged_data['Speed_1'] - merged_data['Speed_2']
+                        # Same matching as the comparison chart's speed delta
+                        _, delta = speed_delta(telemetry1, telemetry2)
                         
-                        diff_stats = pd.DataFrame({
-                            'Metric': ['Maximum Advantage', 'Average Difference', 'Standard Deviation'],
-                            'Value': [
-                                f"{speed_delta.abs().max():.1f} km/h",
-                                f"{speed_delta.mean():.1f} km/h",
-                                f"{speed_delta.std():.1f} km/h"
-                            ],
-                            'Favors': [
-                                driver1_abbrev if speed_delta.max() > 0 else driver2_abbrev,
-                                driver1_abbrev if speed_delta.mean() > 0 else driver2_abbrev,
-                                'N/A'
-                            ]
-                        })
-                        st.dataframe(diff_stats, use_container_width=True)
+                        if delta.size:
+                            # Reduce once to plain scalars; everything below reads only these
+                            delta_max = float(delta.max())
+                            delta_min = float(delta.min())
+                            delta_mean = float(delta.mean())
+                            delta_std = float(delta.std(ddof=1)) if delta.size > 1 else float('nan')
+                            delta_absmax = max(delta_max, -delta_min)
+                            
+                            diff_stats = pd.DataFrame({
+                                'Metric': ['Maximum Advantage', 'Average Difference', 'Standard Deviation'],
+                                'Value': [f"{value:.1f} km/h" for value in (delta_absmax, delta_mean, delta_std)],
+                                'Favors': pd.Categorical(
+                                    [
+                                        driver1_abbrev if delta_max > 0 else driver2_abbrev,
+                                        driver1_abbrev if delta_mean > 0 else driver2_abbrev,
+                                        'N/A'
+                                    ],
+                                    categories=[driver1_abbrev, driver2_abbrev, 'N/A']
+                                )
+                            })
+                            st.dataframe(diff_stats, use_container_width=True)
                     else:
                         st.warning("Required data for speed differential analysis not available")
                 else:
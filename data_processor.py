@@ -1,12 +1,15 @@
 # data_processor.py
 
 import fastf1
-import fastf1.plotting
+import fastf1.exceptions
 import pandas as pd
+import numpy as np
 from typing import Dict, List, Any, Optional
 import logging
 from pathlib import Path
 from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
+import importlib.util
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -24,6 +27,22 @@ class SessionData:
     driver_info: List[Dict[str, str]]  # Driver information from session results
     event_info: Dict[str, Any]   # Event information from session.event
 
+# Compact dtypes for the telemetry channels every chart and metric scans
+_TELEMETRY_DTYPES = {
+    'Speed': 'float32',
+    'RPM': 'float32',
+    'Throttle': 'float32',
+    'Distance': 'float32',
+    'nGear': 'int8',
+    'DRS': 'uint8'
+}
+
+# Low-cardinality timing columns stored as categoricals
+_TIMING_CATEGORIES = ('Driver', 'Team', 'Compound')
+
+# pyarrow is optional; without it text columns keep the object dtype
+_HAS_PYARROW = importlib.util.find_spec('pyarrow') is not None
+
 class F1DataProcessor:
     """Process and manage F1 session data using FastF1."""
 
@@ -31,14 +50,13 @@ class F1DataProcessor:
         """Initialize F1DataProcessor with caching enabled."""
         self.cache_dir = Path(cache_dir)
         self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._circuit_lengths = {}  # (year, round) -> circuit length
         
         # Enable FastF1 caching
         fastf1.Cache.enable_cache(str(self.cache_dir))
         
-        # Enable plotting setup
-        fastf1.plotting.setup_mpl(mpl_timedelta_support=True, misc_mpl_mods=False)
-        
-        logger.info(f"Initialized F1DataProcessor with cache at '{self.cache_dir.resolve()}'")
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Initialized F1DataProcessor with cache at '%s'", self.cache_dir.resolve())
 
     def load_session_data(self, year: int, gp: str, session_type: str) -> SessionData:
         """Load complete session data."""
@@ -48,7 +66,7 @@ class F1DataProcessor:
             session.load(laps=True, telemetry=True, weather=True, messages=True)
             
             # Get timing data
-            timing = session.laps.copy()
+            timing = session.laps.astype(self._get_timing_dtypes(session.laps), copy=False)
             
             # Get telemetry data
             telemetry = self._get_telemetry_data(session)
@@ -64,20 +82,39 @@ class F1DataProcessor:
                 session=session,
                 timing=timing,
                 telemetry=telemetry,
-                weather=session.weather_data if hasattr(session, 'weather_data') else pd.DataFrame(),
-                track_status=session.track_status if hasattr(session, 'track_status') else pd.DataFrame(),
-                race_control=session.race_control_messages if hasattr(session, 'race_control_messages') else pd.DataFrame(),
+                weather=self._get_loaded_frame(session, 'weather_data'),
+                track_status=self._get_loaded_frame(session, 'track_status'),
+                race_control=self._get_loaded_frame(session, 'race_control_messages'),
                 driver_info=driver_info,
                 event_info=event_info
             )
             
-            logger.info(f"Successfully loaded session data for {year} {gp} {session_type}")
+            logger.info("Successfully loaded session data for %s %s %s", year, gp, session_type)
             return session_data
         
         except Exception as e:
-            logger.error(f"Error loading session data: {str(e)}")
+            logger.error("Error loading session data: %s", e)
             raise
 
+    def _get_timing_dtypes(self, laps: pd.DataFrame) -> Dict[str, str]:
+        """Compact dtypes for the label and text columns of the lap timing frame."""
+        dtypes = {col: 'category' for col in _TIMING_CATEGORIES if col in laps.columns}
+        
+        # Remaining text columns become Arrow-backed strings when pyarrow is available
+        if _HAS_PYARROW:
+            for col in laps.columns.difference(list(dtypes)):
+                if laps[col].dtype == object and pd.api.types.infer_dtype(laps[col], skipna=True) == 'string':
+                    dtypes[col] = 'string[pyarrow]'
+        
+        return dtypes
+
+    def _get_loaded_frame(self, session: fastf1.core.Session, name: str) -> pd.DataFrame:
+        """Get a frame loaded by session.load(), or an empty frame if FastF1 failed to load it."""
+        try:
+            return getattr(session, name)
+        except fastf1.exceptions.DataNotLoadedError:
+            return pd.DataFrame()
+
     def _get_driver_info(self, session: fastf1.core.Session) -> List[Dict[str, str]]:
         """
         Extract driver information from session results.
@@ -87,21 +124,25 @@ class F1DataProcessor:
             if hasattr(session, 'results'):
                 results_df = session.results
                 
-                # Process each driver from the results DataFrame
-                for _, driver in results_df.iterrows():
-                    driver_info = {
-                        'number': str(driver['DriverNumber']),
-                        'abbreviation': driver['Abbreviation'],
-                        'fullname': driver['FullName'],
-                        'team': driver['TeamName'],
-                        'team_color': driver['TeamColor']  # Use TeamColor directly from results
-                    }
-                    drivers_info.append(driver_info)
+                # Convert the results columns in one pass (TeamColor used directly from results)
+                drivers_info = (
+                    results_df[['DriverNumber', 'Abbreviation', 'FullName', 'TeamName', 'TeamColor']]
+                    .astype({'DriverNumber': str})
+                    .rename(columns={
+                        'DriverNumber': 'number',
+                        'Abbreviation': 'abbreviation',
+                        'FullName': 'fullname',
+                        'TeamName': 'team',
+                        'TeamColor': 'team_color'
+                    })
+                    .to_dict(orient='records')
+                )
                     
-                logger.info(f"Successfully extracted information for {len(drivers_info)} drivers from results")
+                logger.info("Successfully extracted information for %d drivers from results", len(drivers_info))
                 return drivers_info
                 
-            # Fallback to drivers list if results not available
+            # Fallback to drivers list if results not available (plotting pulls in matplotlib)
+            import fastf1.plotting
             for driver_number in session.drivers:
                 try:
                     driver_data = session.get_driver(driver_number)
@@ -115,14 +156,14 @@ class F1DataProcessor:
                         }
                         drivers_info.append(driver_info)
                 except Exception as e:
-                    logger.warning(f"Could not get info for driver {driver_number}: {str(e)}")
+                    logger.warning("Could not get info for driver %s: %s", driver_number, e)
                     continue
                     
-            logger.info(f"Successfully extracted information for {len(drivers_info)} drivers from drivers list")
+            logger.info("Successfully extracted information for %d drivers from drivers list", len(drivers_info))
             return drivers_info
             
         except Exception as e:
-            logger.error(f"Error getting driver information: {str(e)}")
+            logger.error("Error getting driver information: %s", e)
             return []
 
     def _get_event_info(self, session: fastf1.core.Session) -> Dict[str, Any]:
@@ -143,15 +184,18 @@ class F1DataProcessor:
                     'F1ApiSupport': event['F1ApiSupport']
                 })
 
-            # Get circuit information
+            # Get circuit information; geometry is static, so reuse it across sessions of an event
             try:
-                circuit_info = session.get_circuit_info()
-                if circuit_info and hasattr(circuit_info, 'corners'):
-                    # Take the actual circuit length value
-                    circuit_length = circuit_info.corners['Distance'].max()
-                    event_info['CircuitLength'] = circuit_length
+                circuit_key = (session.event['EventDate'].year, session.event['RoundNumber'])
+                if circuit_key not in self._circuit_lengths:
+                    circuit_info = session.get_circuit_info()
+                    if circuit_info and hasattr(circuit_info, 'corners'):
+                        # Take the actual circuit length value
+                        self._circuit_lengths[circuit_key] = circuit_info.corners['Distance'].max()
+                if circuit_key in self._circuit_lengths:
+                    event_info['CircuitLength'] = self._circuit_lengths[circuit_key]
             except Exception as e:
-                logger.warning(f"Could not get circuit info: {str(e)}")
+                logger.warning("Could not get circuit info: %s", e)
 
             # Get session information
             event_info.update({
@@ -167,7 +211,7 @@ class F1DataProcessor:
             return event_info
             
         except Exception as e:
-            logger.error(f"Error getting event information: {str(e)}")
+            logger.error("Error getting event information: %s", e)
             return {}
 
     def get_event_by_name(self, schedule: pd.DataFrame, name: str) -> pd.Series:
@@ -175,7 +219,7 @@ class F1DataProcessor:
         try:
             return schedule[schedule['EventName'].str.lower() == name.lower()].iloc[0]
         except IndexError:
-            logger.error(f"No event found matching name '{name}'")
+            logger.error("No event found matching name '%s'", name)
             return pd.Series()
 
     def get_event_by_round(self, schedule: pd.DataFrame, round_number: int) -> pd.Series:
@@ -183,33 +227,59 @@ class F1DataProcessor:
         try:
             return schedule[schedule['RoundNumber'] == round_number].iloc[0]
         except IndexError:
-            logger.error(f"No event found for round number {round_number}")
+            logger.error("No event found for round number %s", round_number)
             return pd.Series()
         
     def _get_telemetry_data(self, session: fastf1.core.Session) -> Dict[str, pd.DataFrame]:
         """Get telemetry data for each driver's fastest lap."""
         telemetry_data = {}
         try:
-            for driver in session.drivers:
-                try:
-                    driver_laps = session.laps.pick_driver(driver)
-                    if not driver_laps.empty:
-                        fastest_lap = driver_laps.pick_fastest()
-                        if fastest_lap is not None:
-                            # Get car data
-                            car_data = fastest_lap.get_car_data()
-                            if not car_data.empty:
-                                # Add distance channel
-                                if 'Distance' not in car_data.columns:
-                                    car_data = car_data.copy()
-                                    car_data['Distance'] = car_data['Time'].dt.total_seconds() * car_data['Speed'] / 3.6
-                                telemetry_data[driver] = car_data
-                                
-                except Exception as e:
-                    logger.warning(f"Could not get telemetry for driver {driver}: {str(e)}")
-                    continue
+            drivers = list(session.drivers)
+            
+            # Find every driver's fastest personal-best lap in one grouped reduction
+            laps = session.laps
+            personal_bests = laps[(laps['IsPersonalBest'] == True) & laps['LapTime'].notna()]  # noqa: E712
+            fastest_idx = personal_bests.groupby('DriverNumber', sort=False)['LapTime'].idxmin()
+            fastest_laps = {driver: laps.loc[label] for driver, label in fastest_idx.items()}
+            
+            # Drivers are independent, so extract them concurrently
+            with ThreadPoolExecutor(max_workers=max(1, min(len(drivers), 8))) as executor:
+                results = executor.map(
+                    lambda driver: self._get_driver_telemetry(driver, fastest_laps.get(driver)),
+                    drivers
+                )
+                for driver, car_data in zip(drivers, results):
+                    if car_data is not None:
+                        telemetry_data[driver] = car_data
             
             return telemetry_data
         except Exception as e:
-            logger.error(f"Error processing telemetry data: {str(e)}")
-            return {}    
\ No newline at end of file
+            logger.error("Error processing telemetry data: %s", e)
+            return {}
+
+    def _get_driver_telemetry(self, driver: str, fastest_lap: Optional[fastf1.core.Lap]) -> Optional[pd.DataFrame]:
+        """Get car data for one driver's fastest lap, or None if unavailable."""
+        if fastest_lap is None:
+            return None
+        
+        # Get car data; slicing is the only step that can fail on incomplete data
+        try:
+            car_data = fastest_lap.get_car_data()
+        except Exception as e:
+            logger.warning("Could not get telemetry for driver %s: %s", driver, e)
+            return None
+        if car_data.empty:
+            return None
+        
+        # Add distance channel by integrating speed over time
+        if 'Distance' not in car_data.columns:
+            t = car_data['Time'].to_numpy().astype('timedelta64[ns]').view('i8') * 1e-9
+            dt = np.empty_like(t)
+            dt[0] = 0.0
+            np.subtract(t[1:], t[:-1], out=dt[1:])
+            car_data = car_data.assign(Distance=np.cumsum(dt * car_data['Speed'].to_numpy() / 3.6))
+        
+        # Downcast so every later scan touches fewer bytes
+        return car_data.astype({
+            col: dtype for col, dtype in _TELEMETRY_DTYPES.items() if col in car_data.columns
+        })
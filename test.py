@@ -129,8 +129,10 @@ def test_timing_data(session_data):
                 print(f"{info} data available: {info in session_data.timing.columns}")
                 
             # Print fastest lap info
-            fastest_lap = session_data.timing.sort_values('LapTime').iloc[0]
-            print(f"\nFastest lap by {fastest_lap['Driver']}: {fastest_lap['LapTime']}")
+            lap_times = session_data.timing['LapTime'].dropna()
+            if not lap_times.empty:
+                fastest_lap = session_data.timing.loc[lap_times.idxmin()]
+                print(f"\nFastest lap by {fastest_lap['Driver']}: {fastest_lap['LapTime']}")
         else:
             print("No timing data available for testing")
             
@@ -3,18 +3,99 @@ from plotly.subplots import make_subplots
 import pandas as pd
 import numpy as np
 from typing import Dict, List, Optional, Union, Tuple, Any
-import seaborn as sns
-import matplotlib.pyplot as plt
 import fastf1
 import fastf1.core
 from pathlib import Path
+from functools import lru_cache, wraps
+import re
 import logging
-from data_processor import SessionData 
+from data_processor import SessionData
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Upper bound on telemetry samples sent to the browser per trace
+_MAX_PLOT_POINTS = 2500
+
+# Most labelled ticks on the weather chart's time axis
+_MAX_TIME_TICKS = 10
+
+# Underscore paths into subplot axes, which go.Layout() only accepts as nested dicts
+_AXIS_PATH = re.compile(r'^[xy]axis\d*_')
+
+def _scatter(webgl: bool = False, **props) -> dict:
+    """Plain-dict scatter trace (scattergl if `webgl`) for _raw_figure."""
+    return dict(type='scattergl' if webgl else 'scatter', **props)
+
+@lru_cache(maxsize=None)
+def _subplot_grid(rows: int, cols: int, shared_xaxes: bool, vertical_spacing: float,
+                  subplot_titles: Tuple[str, ...]) -> Dict[str, Any]:
+    """Axis domains and title annotations of a make_subplots grid, built once per shape."""
+    grid = make_subplots(
+        rows=rows, cols=cols,
+        shared_xaxes=shared_xaxes,
+        vertical_spacing=vertical_spacing,
+        subplot_titles=subplot_titles
+    ).layout.to_plotly_json()
+    grid.pop('template', None)
+    return grid
+
+def _merge_layout(base: Dict[str, Any], updates: Dict[str, Any]) -> Dict[str, Any]:
+    """Merge layout updates into a copy of `base` the way update_layout does.
+
+    Nested dicts are merged rather than replaced, so axis updates keep the grid's
+    domains, and axis keys such as 'xaxis2_title_text' address nested values.
+    """
+    merged = dict(base)
+    for key, value in updates.items():
+        if _AXIS_PATH.match(key):
+            key, _, rest = key.partition('_')
+            for part in reversed(rest.split('_')):
+                value = {part: value}
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            value = _merge_layout(merged[key], value)
+        merged[key] = value
+    return merged
+
+def _lttb(x, y, n_out: int = _MAX_PLOT_POINTS) -> Tuple[np.ndarray, np.ndarray]:
+    """x/y arrays reduced to at most `n_out` points with LTTB, keeping the visual shape."""
+    x, y = np.asarray(x), np.asarray(y)
+    if len(x) <= n_out:
+        return x, y
+    keep = lttb_indices(x.astype(np.float64), y.astype(np.float64), n_out)
+    return x[keep], y[keep]
+
+def _speed_by_distance(telemetry: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+    """Distance and Speed arrays in increasing Distance order, sorting only if needed."""
+    distance, speed = telemetry['Distance'].to_numpy(), telemetry['Speed'].to_numpy()
+    # Telemetry is already monotonic in Distance within a lap
+    if not telemetry['Distance'].is_monotonic_increasing:
+        order = np.argsort(distance, kind='stable')
+        distance, speed = distance[order], speed[order]
+    return distance, speed
+
+def _safe_fig(chart: str):
+    """Decorate a chart method to log any error and return an empty figure instead."""
+    def decorator(method):
+        @wraps(method)
+        def wrapper(*args, **kwargs) -> go.Figure:
+            try:
+                return method(*args, **kwargs)
+            except Exception as e:
+                logger.error(f"Error creating {chart}: {e}")
+                return go.Figure()
+        return wrapper
+    return decorator
+
+def _raw_figure(traces: List[dict], layout: Dict[str, Any], **updates) -> go.Figure:
+    """Figure that stores plain-dict traces as-is, skipping per-trace validation and copies.
+
+    `updates` are merged over `layout` without modifying it, and only the result
+    is validated, once, when it is built.
+    """
+    return go.Figure(data=traces, layout=go.Layout(_merge_layout(layout, updates)), _validate=False)
+
 class F1Visualizations:
     """ F1 data visualization class."""
 
@@ -51,13 +132,9 @@ class F1Visualizations:
 
     def __init__(self):
         """Initialize visualization settings."""
-        # Setup matplotlib for F1
-        fastf1.plotting.setup_mpl(
-            mpl_timedelta_support=True,
-            misc_mpl_mods=False,
-            color_scheme='fastf1'
-        )
-        
+        # Team colors as a Series for vectorized lookups
+        self._team_colors_s = pd.Series(self.TEAM_COLORS)
+
         # Base Plotly layout
         self.base_layout = {
             'paper_bgcolor': self.F1_COLORS['background'],
@@ -86,259 +163,235 @@ class F1Visualizations:
             }
         }
 
+        # Layout shared by the two-row subplot charts, with the legend outside the plot
+        self.subplot_layout = _merge_layout(self.base_layout, {'legend': {'x': 1.1, 'y': 1}})
+
+    def _driver_colors(self, timing_data: pd.DataFrame) -> pd.Series:
+        """Team color of each driver in the timing data, mapped in one pass."""
+        if 'Team' not in timing_data.columns:
+            return pd.Series(dtype=object)
+        teams = timing_data.drop_duplicates('Driver').set_index('Driver')['Team']
+        return teams.astype(object).map(self._team_colors_s).fillna(self.F1_COLORS['secondary'])
+
+    @_safe_fig("lap time chart")
     def create_lap_time_chart(self, timing_data: pd.DataFrame) -> go.Figure:
         """Create interactive lap time comparison chart."""
-        try:
-            fig = go.Figure()
-
-            for driver in timing_data['Driver'].unique():
-                driver_data = timing_data[timing_data['Driver'] == driver]
-                team = driver_data['Team'].iloc[0] if 'Team' in driver_data.columns else 'Unknown'
-                color = self.TEAM_COLORS.get(team, self.F1_COLORS['secondary'])
-
-                # Convert lap times to seconds if needed
-                if 'LapTimeSeconds' not in driver_data.columns:
-                    driver_data['LapTimeSeconds'] = driver_data['LapTime'].dt.total_seconds()
-
-                fig.add_trace(go.Scatter(
-                    x=driver_data['LapNumber'],
-                    y=driver_data['LapTimeSeconds'],
-                    name=driver,
-                    line=dict(color=color, width=2),
-                    mode='lines+markers',
-                    marker=dict(size=6),
-                    hovertemplate=(
-                        f"Driver: {driver}<br>" +
-                        "Lap: %{x}<br>" +
-                        "Time: %{y:.3f}s<br>" +
-                        "<extra></extra>"
-                    )
-                ))
-
-            layout = self.base_layout.copy()
-            layout.update({
-                'title': "Lap Time Comparison",
-                'xaxis_title': "Lap Number",
-                'yaxis_title': "Lap Time (seconds)",
-                'hovermode': 'x unified'
-            })
-            fig.update_layout(layout)
-
-            return fig
-        except Exception as e:
-            logger.error(f"Error creating lap time chart: {e}")
-            return go.Figure()
+        traces = []
 
-    def create_position_changes_chart(self, timing_data: pd.DataFrame) -> go.Figure:
-        """Create interactive position changes visualization."""
-        try:
-            fig = go.Figure()
-            
-            # Make sure we have the required columns
-            if not all(col in timing_data.columns for col in ['Driver', 'LapNumber', 'Position']):
-                logger.error("Missing required columns in timing data")
-                return go.Figure()
+        # Convert lap times to seconds once for the whole session if needed
+        if 'LapTimeSeconds' not in timing_data.columns:
+            timing_data = timing_data.assign(LapTimeSeconds=timing_data['LapTime'].dt.total_seconds())
 
-            # Process each driver's data
-            for driver in timing_data['Driver'].unique():
-                driver_data = timing_data[timing_data['Driver'] == driver].copy()
-                
-                # Sort by lap number to ensure correct line plotting
-                driver_data = driver_data.sort_values('LapNumber')
-                
-                # Get team color
-                team = driver_data['Team'].iloc[0] if 'Team' in driver_data.columns else 'Unknown'
-                color = self.TEAM_COLORS.get(team, self.F1_COLORS['secondary'])
-                
-                # Add trace for this driver
-                fig.add_trace(go.Scatter(
-                    x=driver_data['LapNumber'],
-                    y=driver_data['Position'],
-                    name=driver,
-                    line=dict(
-                        color=color,
-                        width=2,
-                    ),
-                    mode='lines+markers',
-                    marker=dict(size=6),
-                    hovertemplate=(
-                        f"Driver: {driver}<br>" +
-                        "Lap: %{x}<br>" +
-                        "Position: %{y}<br>" +
-                        "<extra></extra>"
-                    )
-                ))
-
-            # Update layout with F1-style configuration
-            layout = self.base_layout.copy()
-            layout.update({
-                'title': "Position Changes",
-                'xaxis_title': "Lap Number",
-                'yaxis_title': "Position",
-                'xaxis': {
-                    'gridcolor': self.F1_COLORS['grid'],
-                    'showline': True,
-                    'linecolor': self.F1_COLORS['grid'],
-                    'tickmode': 'linear',
-                    'dtick': 5  # Show every 5th lap
-                },
-                'yaxis': {
-                    'gridcolor': self.F1_COLORS['grid'],
-                    'showline': True,
-                    'linecolor': self.F1_COLORS['grid'],
-                    'autorange': 'reversed',  # Invert Y-axis
-                    'tickmode': 'array',
-                    'tickvals': [1, 5, 10, 15, 20],  # Standard F1 position ticks
-                    'range': [20.5, 0.5]  # Ensure proper range with padding
-                },
-                'hovermode': 'closest',
-                'showlegend': True,
-                'legend': {
-                    'bgcolor': 'rgba(0,0,0,0.5)',
-                    'bordercolor': self.F1_COLORS['grid'],
-                    'x': 1.1,  # Place legend outside the plot
-                    'y': 1
-                }
-            })
-            fig.update_layout(layout)
-
-            return fig
-            
-        except Exception as e:
-            logger.error(f"Error creating position changes chart: {e}")
-            return go.Figure()
+        driver_colors = self._driver_colors(timing_data)
 
-    def create_speed_trace(self, telemetry_data: pd.DataFrame, driver: str, team: str) -> go.Figure:
-        """Create interactive speed trace visualization."""
-        try:
-            fig = go.Figure()
-            color = self.TEAM_COLORS.get(team, self.F1_COLORS['secondary'])
+        for driver, driver_data in timing_data.groupby('Driver', sort=False, observed=True):
+            color = driver_colors.get(driver, self.F1_COLORS['secondary'])
 
-            fig.add_trace(go.Scatter(
-                x=telemetry_data['Distance'],
-                y=telemetry_data['Speed'],
-                name=f'{driver} Speed',
+            traces.append(_scatter(
+                x=driver_data['LapNumber'].to_numpy(),
+                y=driver_data['LapTimeSeconds'].to_numpy(),
+                name=driver,
                 line=dict(color=color, width=2),
-                mode='lines',
+                mode='lines+markers',
+                marker=dict(size=6),
                 hovertemplate=(
                     f"Driver: {driver}<br>" +
-                    "Distance: %{x:.0f}m<br>" +
-                    "Speed: %{y:.1f}km/h<br>" +
+                    "Lap: %{x}<br>" +
+                    "Time: %{y:.3f}s<br>" +
                     "<extra></extra>"
                 )
             ))
 
-            layout = self.base_layout.copy()
-            layout.update({
-                'title': f"Speed Trace - {driver}",
-                'xaxis_title': "Distance (m)",
-                'yaxis_title': "Speed (km/h)"
-            })
-            fig.update_layout(layout)
-
-            return fig
-        except Exception as e:
-            logger.error(f"Error creating speed trace: {e}")
+        fig = _raw_figure(
+            traces,
+            self.base_layout,
+            title="Lap Time Comparison",
+            xaxis_title="Lap Number",
+            yaxis_title="Lap Time (seconds)",
+            hovermode='x unified'
+        )
+
+        return fig
+
+    @_safe_fig("position changes chart")
+    def create_position_changes_chart(self, timing_data: pd.DataFrame) -> go.Figure:
+        """Create interactive position changes visualization."""
+        traces = []
+        
+        # Make sure we have the required columns
+        if not all(col in timing_data.columns for col in ['Driver', 'LapNumber', 'Position']):
+            logger.error("Missing required columns in timing data")
             return go.Figure()
 
-    def create_gear_shifts(self, telemetry_data: pd.DataFrame, driver: str, team: str) -> go.Figure:
-        """Create interactive gear shifts visualization."""
-        try:
-            fig = make_subplots(
-                rows=2, cols=1,
-                shared_xaxes=True,
-                vertical_spacing=0.08,
-                subplot_titles=("Speed", "Gear")
+        driver_colors = self._driver_colors(timing_data)
+
+        # Process each driver's data, sorted by lap number to ensure correct line plotting.
+        # One trace per driver keeps a legend entry and toggle per driver, which a
+        # NaN-joined trace per team would merge into one
+        for driver, driver_data in timing_data.sort_values('LapNumber', kind='stable').groupby('Driver', sort=False, observed=True):
+            # Get team color
+            color = driver_colors.get(driver, self.F1_COLORS['secondary'])
+            
+            # Add trace for this driver
+            traces.append(_scatter(
+                x=driver_data['LapNumber'].to_numpy(),
+                y=driver_data['Position'].to_numpy(),
+                name=driver,
+                line=dict(
+                    color=color,
+                    width=2,
+                ),
+                mode='lines+markers',
+                marker=dict(size=6),
+                hovertemplate=(
+                    f"Driver: {driver}<br>" +
+                    "Lap: %{x}<br>" +
+                    "Position: %{y}<br>" +
+                    "<extra></extra>"
+                )
+            ))
+
+        # Update layout with F1-style configuration
+        fig = _raw_figure(
+            traces,
+            self.base_layout,
+            title="Position Changes",
+            xaxis_title="Lap Number",
+            yaxis_title="Position",
+            # Only the axis and legend keys that differ; base_layout styling is merged in
+            xaxis={
+                'tickmode': 'linear',
+                'dtick': 5  # Show every 5th lap
+            },
+            yaxis={
+                'autorange': 'reversed',  # Invert Y-axis
+                'tickmode': 'array',
+                'tickvals': [1, 5, 10, 15, 20],  # Standard F1 position ticks
+                'range': [20.5, 0.5]  # Ensure proper range with padding
+            },
+            hovermode='closest',
+            legend={
+                'x': 1.1,  # Place legend outside the plot
+                'y': 1
+            }
+        )
+
+        return fig
+
+    @_safe_fig("speed trace")
+    def create_speed_trace(self, telemetry_data: pd.DataFrame, driver: str, team: str,
+                           webgl: bool = False) -> go.Figure:
+        """Create interactive speed trace visualization (WebGL if `webgl`)."""
+        color = self.TEAM_COLORS.get(team, self.F1_COLORS['secondary'])
+        distance, speed = _lttb(telemetry_data['Distance'], telemetry_data['Speed'])
+
+        traces = [_scatter(
+            webgl=webgl,
+            x=distance,
+            y=speed,
+            name=f'{driver} Speed',
+            line=dict(color=color, width=2),
+            mode='lines',
+            hovertemplate=(
+                f"Driver: {driver}<br>" +
+                "Distance: %{x:.0f}m<br>" +
+                "Speed: %{y:.1f}km/h<br>" +
+                "<extra></extra>"
             )
+        )]
+
+        fig = _raw_figure(
+            traces,
+            self.base_layout,
+            title=f"Speed Trace - {driver}",
+            xaxis_title="Distance (m)",
+            yaxis_title="Speed (km/h)"
+        )
+
+        return fig
 
-            color = self.TEAM_COLORS.get(team, self.F1_COLORS['secondary'])
+    @_safe_fig("gear shifts visualization")
+    def create_gear_shifts(self, telemetry_data: pd.DataFrame, driver: str, team: str,
+                           webgl: bool = False) -> go.Figure:
+        """Create interactive gear shifts visualization (WebGL if `webgl`)."""
+        color = self.TEAM_COLORS.get(team, self.F1_COLORS['secondary'])
+        speed_distance, speed = _lttb(telemetry_data['Distance'], telemetry_data['Speed'])
+        gear_distance, gear = _lttb(telemetry_data['Distance'], telemetry_data['nGear'])
 
+        traces = [
             # Speed trace
-            fig.add_trace(
-                go.Scatter(
-                    x=telemetry_data['Distance'],
-                    y=telemetry_data['Speed'],
-                    name='Speed',
-                    line=dict(color=color, width=2),
-                    mode='lines',
-                    hovertemplate="Speed: %{y:.1f}km/h<br>Distance: %{x:.0f}m<extra></extra>"
-                ),
-                row=1, col=1
+            _scatter(
+                webgl=webgl,
+                x=speed_distance,
+                y=speed,
+                name='Speed',
+                line=dict(color=color, width=2),
+                mode='lines',
+                hovertemplate="Speed: %{y:.1f}km/h<br>Distance: %{x:.0f}m<extra></extra>"
+            ),
+            # Gear trace (second row)
+            _scatter(
+                webgl=webgl,
+                x=gear_distance,
+                y=gear,
+                name='Gear',
+                line=dict(color=self.F1_COLORS['accent'], width=2),
+                mode='lines',
+                hovertemplate="Gear: %{y}<br>Distance: %{x:.0f}m<extra></extra>",
+                xaxis='x2', yaxis='y2'
             )
+        ]
+
+        grid = _subplot_grid(2, 1, True, 0.08, ("Speed", "Gear"))
+        fig = _raw_figure(
+            traces,
+            _merge_layout(grid, self.subplot_layout),
+            title=f"Gear Shifts - {driver}",
+            height=600,
+            # Axes labels
+            xaxis2_title_text="Distance (m)",
+            yaxis_title_text="Speed (km/h)",
+            yaxis2_title_text="Gear"
+        )
 
-            # Gear trace
-            fig.add_trace(
-                go.Scatter(
-                    x=telemetry_data['Distance'],
-                    y=telemetry_data['nGear'],
-                    name='Gear',
-                    line=dict(color=self.F1_COLORS['accent'], width=2),
-                    mode='lines',
-                    hovertemplate="Gear: %{y}<br>Distance: %{x:.0f}m<extra></extra>"
-                ),
-                row=2, col=1
-            )
+        return fig
+
+    @_safe_fig("tyre strategy visualization")
+    def create_tyre_strategy(self, timing_data: pd.DataFrame, webgl: bool = False) -> go.Figure:
+        """Create interactive tyre strategy visualization (WebGL if `webgl`)."""
+        # One trace per compound rather than per (driver, compound) pair
+        traces = []
+        for compound, compound_data in timing_data.groupby('Compound', sort=False, observed=True):
+            traces.append(_scatter(
+                webgl=webgl,
+                x=compound_data['LapNumber'].to_numpy(),
+                y=compound_data['Driver'].to_numpy(),
+                name=compound,
+                mode='markers',
+                marker=dict(color=self.TYRE_COLORS.get(compound.upper(), '#FFFFFF'), size=12),
+                hovertemplate=(
+                    "Driver: %{y}<br>" +
+                    "Lap: %{x}<br>" +
+                    f"Compound: {compound}<br>" +
+                    "<extra></extra>"
+                )
+            ))
 
-            layout = self.base_layout.copy()
-            layout.update({
-                'title': f"Gear Shifts - {driver}",
-                'height': 600,
-                'showlegend': True,
-                'legend': dict(x=1.1, y=1)
-            })
-            fig.update_layout(layout)
-
-            # Update axes labels
-            fig.update_xaxes(title_text="Distance (m)", row=2, col=1)
-            fig.update_yaxes(title_text="Speed (km/h)", row=1, col=1)
-            fig.update_yaxes(title_text="Gear", row=2, col=1)
-
-            return fig
-        except Exception as e:
-            logger.error(f"Error creating gear shifts visualization: {e}")
-            return go.Figure()
+        fig = _raw_figure(
+            traces,
+            self.base_layout,
+            title="Tyre Strategy",
+            xaxis_title="Lap Number",
+            yaxis_title="Driver",
+            # Keep drivers in running order whichever compound they used first
+            yaxis_categoryorder='array',
+            yaxis_categoryarray=timing_data['Driver'].unique(),
+            height=600
+        )
 
-    def create_tyre_strategy(self, timing_data: pd.DataFrame) -> go.Figure:
-        """Create interactive tyre strategy visualization."""
-        try:
-            fig = go.Figure()
-
-            for driver in timing_data['Driver'].unique():
-                driver_data = timing_data[timing_data['Driver'] == driver]
-                
-                for compound in driver_data['Compound'].unique():
-                    compound_data = driver_data[driver_data['Compound'] == compound]
-                    color = self.TYRE_COLORS.get(compound.upper(), '#FFFFFF')
-
-                    fig.add_trace(go.Scatter(
-                        x=compound_data['LapNumber'],
-                        y=[driver] * len(compound_data),
-                        name=f"{driver} - {compound}",
-                        mode='markers',
-                        marker=dict(color=color, size=12),
-                        showlegend=(driver == timing_data['Driver'].unique()[0]),
-                        hovertemplate=(
-                            f"Driver: {driver}<br>" +
-                            "Lap: %{x}<br>" +
-                            f"Compound: {compound}<br>" +
-                            "<extra></extra>"
-                        )
-                    ))
-
-            layout = self.base_layout.copy()
-            layout.update({
-                'title': "Tyre Strategy",
-                'xaxis_title': "Lap Number",
-                'yaxis_title': "Driver",
-                'height': 600
-            })
-            fig.update_layout(layout)
-
-            return fig
-        except Exception as e:
-            logger.error(f"Error creating tyre strategy visualization: {e}")
-            return go.Figure()
+        return fig
 
+    @_safe_fig("driver comparison")
     def create_driver_comparison(
         self,
         telemetry_data1: pd.DataFrame,
@@ -346,172 +399,190 @@ class F1Visualizations:
         driver1: str,
         driver2: str,
         team1: str,
-        team2: str
+        team2: str,
+        webgl: bool = False
     ) -> go.Figure:
-        """Create interactive driver comparison visualization."""
-        try:
-            fig = make_subplots(
-                rows=2, cols=1,
-                shared_xaxes=True,
-                vertical_spacing=0.08,
-                subplot_titles=("Speed Comparison", "Speed Delta")
+        """Create interactive driver comparison visualization (WebGL speed traces if `webgl`)."""
+        color1 = self.TEAM_COLORS.get(team1, self.F1_COLORS['secondary'])
+        color2 = self.TEAM_COLORS.get(team2, self.F1_COLORS['secondary'])
+        distance1_plot, speed1_plot = _lttb(telemetry_data1['Distance'], telemetry_data1['Speed'])
+        distance2_plot, speed2_plot = _lttb(telemetry_data2['Distance'], telemetry_data2['Speed'])
+
+        # Speed comparison
+        traces = [
+            _scatter(
+                webgl=webgl,
+                x=distance1_plot,
+                y=speed1_plot,
+                name=f'{driver1} Speed',
+                line=dict(color=color1, width=2),
+                mode='lines'
+            ),
+            _scatter(
+                webgl=webgl,
+                x=distance2_plot,
+                y=speed2_plot,
+                name=f'{driver2} Speed',
+                line=dict(color=color2, width=2),
+                mode='lines'
             )
-
-            color1 = self.TEAM_COLORS.get(team1, self.F1_COLORS['secondary'])
-            color2 = self.TEAM_COLORS.get(team2, self.F1_COLORS['secondary'])
-
-            # Speed comparison
-            fig.add_trace(
-                go.Scatter(
-                    x=telemetry_data1['Distance'],
-                    y=telemetry_data1['Speed'],
-                    name=f'{driver1} Speed',
-                    line=dict(color=color1, width=2),
-                    mode='lines'
-                ),
-                row=1, col=1
-            )
-
-            fig.add_trace(
-                go.Scatter(
-                    x=telemetry_data2['Distance'],
-                    y=telemetry_data2['Speed'],
-                    name=f'{driver2} Speed',
-                    line=dict(color=color2, width=2),
-                    mode='lines'
-                ),
-                row=1, col=1
+        ]
+
+        # Calculate and plot speed delta, resampling driver 2's speed onto driver 1's distances
+        delta_distance, delta = speed_delta(telemetry_data1, telemetry_data2)
+        delta_distance, delta = _lttb(delta_distance, delta)
+
+        traces.append(
+            _scatter(
+                x=delta_distance,
+                y=delta,
+                name='Speed Delta',
+                fill='tozeroy',
+                line=dict(color=self.F1_COLORS['accent']),
+                mode='lines',
+                xaxis='x2', yaxis='y2'
             )
+        )
 
-            # Calculate and plot speed delta
-            merged_data = pd.merge_asof(
-                telemetry_data1[['Distance', 'Speed']].sort_values('Distance'),
-                telemetry_data2[['Distance', 'Speed']].sort_values('Distance'),
-                on='Distance',
-                suffixes=('_1', '_2')
-            )
-            
-            speed_delta = merged_data['Speed_1'] - merged_data['Speed_2']
-
-            fig.add_trace(
-                go.Scatter(
-                    x=merged_data['Distance'],
-                    y=speed_delta,
-                    name='Speed Delta',
-                    fill='tozeroy',
-                    line=dict(color=self.F1_COLORS['accent']),
-                    mode='lines'
-                ),
-                row=2, col=1
-            )
+        grid = _subplot_grid(2, 1, True, 0.08, ("Speed Comparison", "Speed Delta"))
+        fig = _raw_figure(
+            traces,
+            _merge_layout(grid, self.subplot_layout),
+            title=f"{driver1} vs {driver2} Comparison",
+            height=800,
+            # Axes labels
+            xaxis2_title_text="Distance (m)",
+            yaxis_title_text="Speed (km/h)",
+            yaxis2_title_text="Speed Delta (km/h)"
+        )
 
-            layout = self.base_layout.copy()
-            layout.update({
-                'title': f"{driver1} vs {driver2} Comparison",
-                'height': 800
-            })
-            fig.update_layout(layout)
-
-            # Update axes labels
-            fig.update_xaxes(title_text="Distance (m)", row=2, col=1)
-            fig.update_yaxes(title_text="Speed (km/h)", row=1, col=1)
-            fig.update_yaxes(title_text="Speed Delta (km/h)", row=2, col=1)
-
-            return fig
-        except Exception as e:
-            logger.error(f"Error creating driver comparison: {e}")
-            return go.Figure()
+        return fig
 
     
-    def create_weather_chart(self, weather_data: pd.DataFrame) -> go.Figure:
-        """Create interactive weather conditions visualization."""
-        try:
-            fig = make_subplots(
-                rows=2, cols=1,
-                shared_xaxes=True,
-                vertical_spacing=0.1,
-                subplot_titles=("Temperature", "Other Conditions")
-            )
+    @_safe_fig("weather chart")
+    def create_weather_chart(self, weather_data: pd.DataFrame, webgl: bool = False) -> go.Figure:
+        """Create interactive weather conditions visualization (WebGL if `webgl`)."""
+        # Session time in seconds, shared by every trace and the time axis ticks
+        t_sec = weather_data['Time'].dt.total_seconds().to_numpy()
 
+        traces = [
             # Temperature traces
-            fig.add_trace(
-                go.Scatter(
-                    x=weather_data['Time'].dt.total_seconds(),
-                    y=weather_data['TrackTemp'],
-                    name='Track Temperature',
-                    line=dict(color='#FF5733', width=2),
-                    mode='lines'
-                ),
-                row=1, col=1
-            )
-
-            fig.add_trace(
-                go.Scatter(
-                    x=weather_data['Time'].dt.total_seconds(),
-                    y=weather_data['AirTemp'],
-                    name='Air Temperature',
-                    line=dict(color='#33C1FF', width=2),
-                    mode='lines'
-                ),
-                row=1, col=1
-            )
-
-            # Humidity and wind speed
-            fig.add_trace(
-                go.Scatter(
-                    x=weather_data['Time'].dt.total_seconds(),
-                    y=weather_data['Humidity'],
-                    name='Humidity',
-                    line=dict(color='#33FF57', width=2),
-                    mode='lines'
-                ),
-                row=2, col=1
-            )
-
-            fig.add_trace(
-                go.Scatter(
-                    x=weather_data['Time'].dt.total_seconds(),
-                    y=weather_data['WindSpeed'],
-                    name='Wind Speed',
-                    line=dict(color='#FF33FF', width=2),
-                    mode='lines'
-                ),
-                row=2, col=1
+            _scatter(
+                webgl=webgl,
+                x=t_sec,
+                y=weather_data['TrackTemp'].to_numpy(),
+                name='Track Temperature',
+                line=dict(color='#FF5733', width=2),
+                mode='lines'
+            ),
+            _scatter(
+                webgl=webgl,
+                x=t_sec,
+                y=weather_data['AirTemp'].to_numpy(),
+                name='Air Temperature',
+                line=dict(color='#33C1FF', width=2),
+                mode='lines'
+            ),
+            # Humidity and wind speed (second row)
+            _scatter(
+                webgl=webgl,
+                x=t_sec,
+                y=weather_data['Humidity'].to_numpy(),
+                name='Humidity',
+                line=dict(color='#33FF57', width=2),
+                mode='lines',
+                xaxis='x2', yaxis='y2'
+            ),
+            _scatter(
+                webgl=webgl,
+                x=t_sec,
+                y=weather_data['WindSpeed'].to_numpy(),
+                name='Wind Speed',
+                line=dict(color='#FF33FF', width=2),
+                mode='lines',
+                xaxis='x2', yaxis='y2'
             )
+        ]
+
+        # Label at most _MAX_TIME_TICKS evenly spaced samples on the time axis
+        tick_idx = np.linspace(0, len(t_sec) - 1, min(len(t_sec), _MAX_TIME_TICKS)).astype(np.int64)
+        tickvals = t_sec[tick_idx]
+
+        # Update layout
+        grid = _subplot_grid(2, 1, True, 0.1, ("Temperature", "Other Conditions"))
+        fig = _raw_figure(
+            traces,
+            _merge_layout(grid, self.subplot_layout),
+            title="Weather Conditions",
+            height=700,
+            xaxis2={
+                'title': "Time (HH:MM:SS)",
+                'tickmode': 'array',
+                'ticktext': format_timedelta_array(tickvals),
+                'tickvals': tickvals
+            },
+            # Axes labels
+            yaxis_title_text="Temperature (°C)",
+            yaxis2_title_text="Value"
+        )
 
-            # Update layout
-            layout = self.base_layout.copy()
-            layout.update({
-                'title': "Weather Conditions",
-                'height': 700,
-                'showlegend': True,
-                'legend': dict(x=1.1, y=1),
-                'xaxis2': {
-                    'title': "Time (HH:MM:SS)",
-                    'tickmode': 'array',
-                    'ticktext': [format_timedelta(pd.Timedelta(seconds=x)) 
-                                for x in weather_data['Time'].dt.total_seconds()],
-                    'tickvals': weather_data['Time'].dt.total_seconds()
-                }
-            })
-            fig.update_layout(layout)
-
-            # Update axes labels
-            fig.update_yaxes(title_text="Temperature (°C)", row=1, col=1)
-            fig.update_yaxes(title_text="Value", row=2, col=1)
-
-            return fig
-        except Exception as e:
-            logger.error(f"Error creating weather chart: {e}")
-            return go.Figure()
+        return fig
 
 def format_timedelta(td: pd.Timedelta) -> str:
-    """Format timedelta to HH:MM:SS string."""
-    try:
-        total_seconds = td.total_seconds()
-        hours = int(total_seconds // 3600)
-        minutes = int((total_seconds % 3600) // 60)
-        seconds = int(total_seconds % 60)
-        return f"{hours:02d}:{minutes:02d}:{seconds:02d}"
-    except:
-        return "00:00:00"
+    """Format timedelta to HH:MM:SS string (missing values become 00:00:00)."""
+    return str(format_timedelta_array([pd.Timedelta(td).total_seconds()])[0])
+
+def format_timedelta_array(seconds: np.ndarray) -> np.ndarray:
+    """Format an array of seconds to HH:MM:SS strings (missing values become 00:00:00)."""
+    seconds = np.nan_to_num(np.asarray(seconds, dtype=np.float64)).astype(np.int64)
+    if seconds.size == 0:
+        return np.array([], dtype=str)
+    minutes, secs = np.divmod(seconds, 60)
+    hours, minutes = np.divmod(minutes, 60)
+    parts = [np.char.zfill(part.astype(str), 2) for part in (hours, minutes, secs)]
+    return np.char.add(np.char.add(np.char.add(parts[0], ':'), np.char.add(parts[1], ':')), parts[2])
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """Indices kept by Largest-Triangle-Three-Buckets downsampling.
+
+    The first and last points are always kept; every bucket in between
+    contributes the point forming the largest triangle with the previously
+    kept point and the mean of the next bucket.
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    indices = np.empty(n_out, dtype=np.int64)
+    indices[0], indices[-1] = 0, n - 1
+
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        if i + 2 < len(edges):
+            next_x = x[end:edges[i + 2]].mean()
+            next_y = y[end:edges[i + 2]].mean()
+        else:
+            next_x, next_y = x[-1], y[-1]
+
+        area = np.abs(
+            (x[a] - next_x) * (y[start:end] - y[a]) -
+            (x[a] - x[start:end]) * (next_y - y[a])
+        )
+        a = start + int(area.argmax())
+        indices[i + 1] = a
+
+    return indices
+
+def speed_delta(telemetry1: pd.DataFrame, telemetry2: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+    """Speed of driver 1 minus driver 2 at each of driver 1's distances.
+
+    Each sample is matched to driver 2's last sample at or before its distance;
+    samples before driver 2's first distance are dropped.
+    """
+    distance1, speed1 = _speed_by_distance(telemetry1)
+    distance2, speed2 = _speed_by_distance(telemetry2)
+    idx = np.searchsorted(distance2, distance1, side='right') - 1
+    matched = idx >= 0
+    return distance1[matched], speed1[matched] - speed2[idx[matched]]